@@ -0,0 +1,26 @@
+import argparse
+
+from gnevaltest import build_sweep, write_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the test sweep to a JSON manifest for sharded runs"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="sweep_manifest.json",
+        help="Output manifest path (default: sweep_manifest.json)",
+    )
+
+    args = parser.parse_args()
+
+    sweep = build_sweep()
+    write_manifest(sweep, args.output)
+
+    print(f"Wrote {len(sweep)} test configurations to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import importlib
+
+from .sweep import build_sweep, load_manifest, shard, write_manifest
+
+# Names from .core, which imports bpy. They are loaded on first access so the
+# sweep and manifest helpers can be used without a Blender install.
+_CORE_NAMES = (
+    "PARTICLE_FIELDS",
+    "RAYCAST_FIELDS",
+    "REGISTERED_TESTS",
+    "RESULT_FIELDS",
+    "TESTS_BY_NAME",
+    "TIMING_FIELDS",
+    "bake_and_time",
+    "bake_cache_root",
+    "disable_undo",
+    "get_bake_cache_dir",
+    "load_scene",
+    "test_particle",
+    "test_raycast",
+    "test_schema",
+)
+
+
+def __getattr__(name):
+    if name in _CORE_NAMES:
+        return getattr(importlib.import_module(".core", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "PARTICLE_FIELDS",
+    "RAYCAST_FIELDS",
+    "REGISTERED_TESTS",
+    "RESULT_FIELDS",
+    "TESTS_BY_NAME",
+    "TIMING_FIELDS",
+    "bake_and_time",
+    "bake_cache_root",
+    "build_sweep",
+    "disable_undo",
+    "get_bake_cache_dir",
+    "load_manifest",
+    "load_scene",
+    "shard",
+    "test_particle",
+    "test_raycast",
+    "test_schema",
+    "write_manifest",
+]
@@ -0,0 +1,219 @@
+import atexit
+import functools
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import bpy
+
+# Timing columns returned by bake_and_time
+FRAME_TIMING_FIELDS = (
+    "frame_mean_ms",
+    "frame_p50_ms",
+    "frame_p95_ms",
+    "frame_stdev_ms",
+)
+TIMING_FIELDS = ("elapsed_time", "cpu_time", *FRAME_TIMING_FIELDS)
+
+# Where the bake went, plus its timings
+BAKE_FIELDS = ("bake_target", *TIMING_FIELDS)
+
+# Columns returned by each test function
+PARTICLE_FIELDS = ("test_name", "test_file", "n_frames", "density", *BAKE_FIELDS)
+RAYCAST_FIELDS = ("test_name", "test_file", "cubes", "points", *BAKE_FIELDS)
+
+# Test functions registered with @test_schema, in definition order
+REGISTERED_TESTS: List[Callable[..., Dict[str, Any]]] = []
+
+
+def test_schema(*keys: str):
+    """Declare the result keys returned by a test function and register it."""
+
+    def decorator(func):
+        func.csv_keys = keys
+        REGISTERED_TESTS.append(func)
+        return func
+
+    return decorator
+
+
+PARTICLE_FILE = "basic_particle_simulation.blend"
+RAYCAST_FILE = "raycasting.blend"
+
+
+def disable_undo():
+    """Turn off the undo system, which has no use in a headless benchmark.
+
+    Preferences are per-process, so this must run in every worker.
+    """
+    prefs = bpy.context.preferences.edit
+    prefs.use_global_undo = False
+    prefs.undo_steps = 0
+
+
+def load_scene(filepath: str) -> bool:
+    """Open a .blend file unless it is already the current main file.
+
+    Returns True if the file was (re)loaded from disk.
+    """
+    current = bpy.data.filepath
+    if current and Path(current).resolve() == Path(filepath).resolve():
+        return False
+    # Screen layouts are never used headless, so skip reading them
+    bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+    return True
+
+
+def bake_cache_root() -> Path:
+    """Directory bake caches are written under, RAM-backed /dev/shm if available."""
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return Path(tempfile.gettempdir())
+
+
+@functools.lru_cache(maxsize=None)
+def get_bake_cache_dir() -> Path:
+    """Per-process directory for bake caches, removed when the process exits."""
+    cache_dir = Path(
+        tempfile.mkdtemp(prefix="gnevaltest_cache_", dir=bake_cache_root())
+    )
+    # Spawned pool workers exit through sys.exit, so atexit runs there too
+    atexit.register(shutil.rmtree, cache_dir, ignore_errors=True)
+    return cache_dir
+
+
+def _clear_bake(obj: bpy.types.Object) -> str:
+    """Drop any bake left over from a previous run on the same file.
+
+    Disk bakes are redirected to the bake cache directory so timings don't
+    depend on the storage the .blend file lives on. Packed bakes stay in
+    memory. Returns the bake target of the object's Geometry Nodes modifiers.
+    """
+    targets = set()
+    for modifier in obj.modifiers:
+        if modifier.type == "NODES":
+            targets.add(modifier.bake_target)
+            if modifier.bake_target == "DISK":
+                modifier.bake_directory = str(get_bake_cache_dir() / obj.name)
+    obj.select_set(True)
+    bpy.ops.object.simulation_nodes_cache_delete(selected=True)
+    obj.update_tag()
+    return "+".join(sorted(targets))
+
+
+def _summarize_frame_times(frame_times_ns: List[int]) -> Dict[str, Any]:
+    """Summarize per-frame durations in milliseconds, blank if none recorded."""
+    if not frame_times_ns:
+        return {key: "" for key in FRAME_TIMING_FIELDS}
+    frame_ms = [ns / 1e6 for ns in frame_times_ns]
+    if len(frame_ms) > 1:
+        # "inclusive" matches linear-interpolated percentiles
+        p95 = statistics.quantiles(frame_ms, n=20, method="inclusive")[18]
+    else:
+        p95 = frame_ms[0]
+    return {
+        "frame_mean_ms": statistics.fmean(frame_ms),
+        "frame_p50_ms": statistics.median(frame_ms),
+        "frame_p95_ms": p95,
+        "frame_stdev_ms": statistics.pstdev(frame_ms),
+    }
+
+
+def bake_and_time(obj: bpy.types.Object) -> Dict[str, Any]:
+    """Bake simulation and return its timings.
+
+    Includes elapsed wall-clock and CPU time in seconds, plus a summary of the
+    time between successive frame changes during the bake.
+    """
+    obj.select_set(True)
+    start = time.perf_counter_ns()
+    frame_times = []
+    last = [start]
+
+    def _on_frame(scene, depsgraph):
+        now = time.perf_counter_ns()
+        frame_times.append(now - last[0])
+        last[0] = now
+
+    bpy.app.handlers.frame_change_post.append(_on_frame)
+    cpu_start = time.process_time_ns()
+    try:
+        bpy.ops.object.simulation_nodes_cache_bake(selected=True)
+    finally:
+        cpu_time = (time.process_time_ns() - cpu_start) / 1e9
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        bpy.app.handlers.frame_change_post.remove(_on_frame)
+
+    print(f"Bake completed in {elapsed:.2f}s ({cpu_time:.2f}s CPU)")
+    return {
+        "elapsed_time": elapsed,
+        "cpu_time": cpu_time,
+        **_summarize_frame_times(frame_times),
+    }
+
+
+def _load_particle_scene() -> bpy.types.Object:
+    load_scene(PARTICLE_FILE)
+    return bpy.data.objects["Particles"]
+
+
+def _run_particle(obj: bpy.types.Object, n_frames: int, density: int) -> Dict[str, Any]:
+    bpy.context.scene.frame_end = n_frames
+    obj.modifiers["GeometryNodes"]["Input_3"] = density
+    bake_target = _clear_bake(obj)
+    return {"bake_target": bake_target, **bake_and_time(obj)}
+
+
+@test_schema(*PARTICLE_FIELDS)
+def test_particle(n_frames: int = 100, density: int = 1_000) -> Dict[str, Any]:
+    """Run particle simulation test and return results."""
+    obj = _load_particle_scene()
+    timings = _run_particle(obj, n_frames, density)
+
+    return {
+        "test_name": "particle",
+        "test_file": PARTICLE_FILE,
+        "n_frames": n_frames,
+        "density": density,
+        **timings,
+    }
+
+
+def _load_raycast_scene() -> bpy.types.Object:
+    load_scene(RAYCAST_FILE)
+    return bpy.data.objects["Cube"]
+
+
+def _run_raycast(obj: bpy.types.Object, cubes: int, points: int) -> Dict[str, Any]:
+    tree = obj.modifiers["GeometryNodes"].node_group
+    tree.nodes["Points.001"].inputs["Count"].default_value = cubes
+    tree.nodes["Points"].inputs["Count"].default_value = points
+    bake_target = _clear_bake(obj)
+    return {"bake_target": bake_target, **bake_and_time(obj)}
+
+
+@test_schema(*RAYCAST_FIELDS)
+def test_raycast(cubes: int = 10_000, points: int = 10_000) -> Dict[str, Any]:
+    """Run raycast test and return results."""
+    obj = _load_raycast_scene()
+    timings = _run_raycast(obj, cubes, points)
+
+    return {
+        "test_name": "raycast",
+        "test_file": RAYCAST_FILE,
+        "cubes": cubes,
+        "points": points,
+        **timings,
+    }
+
+
+# CSV result columns: the union of all declared test schemas
+RESULT_FIELDS = sorted(set().union(*(func.csv_keys for func in REGISTERED_TESTS)))
+
+# Lookup for test functions named in sweep manifests
+TESTS_BY_NAME = {func.__name__: func for func in REGISTERED_TESTS}
@@ -0,0 +1,45 @@
+import itertools
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+# # Define parameter ranges (small to large)
+# PARTICLE_N_FRAMES = [50, 100, 200]
+# PARTICLE_DENSITY = [500, 1_000, 2_500, 5_000]
+
+# RAYCAST_CUBES = [1_000, 5_000, 10_000, 20_000]
+# RAYCAST_POINTS = [1_000, 5_000, 10_000, 20_000]
+#
+PARTICLE_N_FRAMES = [50, 100]
+PARTICLE_DENSITY = [500, 1_000]
+
+RAYCAST_CUBES = [1_000, 5_000]
+RAYCAST_POINTS = [1_000, 5_000]
+
+
+def build_sweep() -> List[Dict[str, Any]]:
+    """Generate all test configurations, naming each test function by string."""
+    return [
+        {"test": "test_particle", "params": {"n_frames": n_frames, "density": density}}
+        for n_frames, density in itertools.product(PARTICLE_N_FRAMES, PARTICLE_DENSITY)
+    ] + [
+        {"test": "test_raycast", "params": {"cubes": cubes, "points": points}}
+        for cubes, points in itertools.product(RAYCAST_CUBES, RAYCAST_POINTS)
+    ]
+
+
+def write_manifest(sweep: List[Dict[str, Any]], path: str):
+    """Write a sweep to a JSON manifest file."""
+    Path(path).write_text(json.dumps(sweep, indent=2) + "\n")
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """Load a sweep from a JSON manifest file."""
+    return json.loads(Path(path).read_text())
+
+
+def shard(sweep: List[Dict[str, Any]], index: int, count: int) -> List[Dict[str, Any]]:
+    """Return the configs for shard ``index`` of ``count`` (``sweep[index::count]``)."""
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index {index} out of range for {count} shards")
+    return sweep[index::count]
@@ -1,14 +1,30 @@
 import argparse
+import contextlib
 import csv
-import itertools
+import functools
+import multiprocessing
+import os
 import platform
-import time
+import re
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 import bpy
 
+from gnevaltest import (
+    RESULT_FIELDS,
+    TESTS_BY_NAME,
+    bake_cache_root,
+    build_sweep,
+    disable_undo,
+    load_manifest,
+    shard,
+)
+
 try:
     import psutil
 
@@ -17,16 +33,65 @@ except ImportError:
     PSUTIL_AVAILABLE = False
 
 
-def get_cpu_info() -> Dict[str, str]:
-    """Get detailed CPU information."""
+def _read_cpufreq_khz(name: str) -> Optional[int]:
+    """Read a cpu0 cpufreq value in kHz from sysfs, or None if unavailable."""
+    try:
+        return int(Path(f"/sys/devices/system/cpu/cpu0/cpufreq/{name}").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_total_ram_bytes() -> Optional[int]:
+    """Read total memory from /proc/meminfo, or None if unavailable."""
+    try:
+        # The first line is always "MemTotal: <n> kB"
+        with open("/proc/meminfo", "rb") as f:
+            return int(f.read(256).split(maxsplit=2)[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# CPU metadata columns, always present so CSVs from different machines share
+# the same header; values that can't be determined are left blank
+CPU_INFO_FIELDS = (
+    "cpu_physical_cores",
+    "cpu_logical_cores",
+    "cpu_freq_current_mhz",
+    "cpu_freq_min_mhz",
+    "cpu_freq_max_mhz",
+    "total_ram_gb",
+    "cpu_model",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_cpu_info() -> Mapping[str, str]:
+    """Get detailed CPU information, keyed by ``CPU_INFO_FIELDS``.
+
+    Cached per process and returned read-only.
+    """
     cpu_info = {}
+    is_linux = platform.system() == "Linux"
 
     if PSUTIL_AVAILABLE:
         # Physical and logical core counts
         cpu_info["cpu_physical_cores"] = str(psutil.cpu_count(logical=False))
         cpu_info["cpu_logical_cores"] = str(psutil.cpu_count(logical=True))
-
-        # CPU frequency
+    else:
+        cpu_info["cpu_logical_cores"] = str(os.cpu_count())
+
+    # CPU frequency, read directly from sysfs on Linux
+    if is_linux:
+        for key, name in (
+            ("cpu_freq_current_mhz", "scaling_cur_freq"),
+            ("cpu_freq_min_mhz", "cpuinfo_min_freq"),
+            ("cpu_freq_max_mhz", "cpuinfo_max_freq"),
+        ):
+            khz = _read_cpufreq_khz(name)
+            if khz is not None:
+                cpu_info[key] = f"{khz / 1000:.2f}"
+
+    if PSUTIL_AVAILABLE and "cpu_freq_current_mhz" not in cpu_info:
         try:
             freq = psutil.cpu_freq()
             if freq:
@@ -36,29 +101,40 @@ def get_cpu_info() -> Dict[str, str]:
         except Exception:
             pass
 
-        # Memory info
+    # Memory info
+    total_ram = _read_total_ram_bytes() if is_linux else None
+    if total_ram is None and PSUTIL_AVAILABLE:
         try:
-            mem = psutil.virtual_memory()
-            cpu_info["total_ram_gb"] = f"{mem.total / (1024**3):.2f}"
+            total_ram = psutil.virtual_memory().total
         except Exception:
             pass
+    if total_ram is not None:
+        cpu_info["total_ram_gb"] = f"{total_ram / (1024**3):.2f}"
 
     # Try to get CPU model name from /proc/cpuinfo on Linux
-    if platform.system() == "Linux":
+    if is_linux:
         try:
-            with open("/proc/cpuinfo", "r") as f:
-                for line in f:
-                    if "model name" in line:
-                        cpu_info["cpu_model"] = line.split(":")[1].strip()
-                        break
+            # The model name is within the first entry, so one bounded read is enough
+            with open("/proc/cpuinfo", "rb") as f:
+                data = f.read(4096)
+            match = re.search(rb"^model name\s*:\s*(.+)$", data, re.MULTILINE)
+            if match:
+                cpu_info["cpu_model"] = match.group(1).decode().strip()
         except Exception:
             pass
 
-    return cpu_info
+    return types.MappingProxyType(
+        {key: cpu_info.get(key, "") for key in CPU_INFO_FIELDS}
+    )
+
 
+@functools.lru_cache(maxsize=None)
+def get_platform_metadata() -> Mapping[str, str]:
+    """Collect platform and system metadata, including ``get_cpu_info()``.
 
-def get_platform_metadata() -> Dict[str, str]:
-    """Collect platform and system metadata."""
+    Computed once per process; callers get a read-only view and copy it to
+    build rows.
+    """
     # Get Blender version as a formatted string
     bpy_version = ".".join(map(str, bpy.app.version))
 
@@ -76,106 +152,273 @@ def get_platform_metadata() -> Dict[str, str]:
     # Add detailed CPU and hardware info
     metadata.update(get_cpu_info())
 
-    return metadata
+    return types.MappingProxyType(metadata)
 
 
-def _bake_and_time(obj: bpy.types.Object) -> float:
-    """Bake simulation and return elapsed time."""
-    obj.select_set(True)
-    start = time.time()
-    bpy.ops.object.simulation_nodes_cache_bake(selected=True)
-    end = time.time()
-    elapsed = end - start
-    print(f"Bake completed in {elapsed:.2f}s")
-    return elapsed
+def _describe(config: Dict[str, Any]) -> str:
+    return f"{config['test'].__name__} with {config['params']}"
 
 
-def test_particle(n_frames: int = 100, density: int = 1_000) -> Dict[str, Any]:
-    """Run particle simulation test and return results."""
-    test_file = "basic_particle_simulation.blend"
-    bpy.ops.wm.open_mainfile(filepath=test_file)
-    bpy.context.scene.frame_end = n_frames
-    obj = bpy.data.objects["Particles"]
-    obj.modifiers["GeometryNodes"]["Input_3"] = density
+def _run_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a single test configuration and return its result."""
+    return config["test"](**config["params"])
 
-    elapsed_time = _bake_and_time(obj)
 
-    return {
-        "test_name": "particle",
-        "test_file": test_file,
-        "n_frames": n_frames,
-        "density": density,
-        "elapsed_time": elapsed_time,
-    }
+def estimated_cost(config: Dict[str, Any]) -> int:
+    """Rough relative cost of a test configuration, used to order dispatch."""
+    params = config["params"]
+    particle_cost = params.get("n_frames", 0) * params.get("density", 0)
+    raycast_cost = params.get("cubes", 0) * params.get("points", 0)
+    return particle_cost + raycast_cost
 
 
-def test_raycast(cubes: int = 10_000, points: int = 10_000) -> Dict[str, Any]:
-    """Run raycast test and return results."""
-    test_file = "raycasting.blend"
-    bpy.ops.wm.open_mainfile(filepath=test_file)
-    obj = bpy.data.objects["Cube"]
-    tree = obj.modifiers["GeometryNodes"].node_group
-    tree.nodes["Points.001"].inputs["Count"].default_value = cubes
-    tree.nodes["Points"].inputs["Count"].default_value = points
+def _available_cores() -> int:
+    """Number of logical cores this process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
 
-    elapsed_time = _bake_and_time(obj)
 
+def physical_cores() -> int:
+    """Number of physical cores this process can use, or logical if unknown."""
+    cores = _available_cores()
+    if PSUTIL_AVAILABLE:
+        cores = min(cores, psutil.cpu_count(logical=False) or cores)
+    return cores
+
+
+def default_jobs(threads_per_bake: Optional[int] = None) -> int:
+    """Number of worker processes to use, based on physical core count.
+
+    Each bake already spreads over every core through Blender's own threading,
+    so unless ``threads_per_bake`` says otherwise this is 1.
+    """
+    cores = physical_cores()
+    if threads_per_bake is None:
+        threads_per_bake = cores
+    return max(1, cores // max(1, threads_per_bake))
+
+
+@contextlib.contextmanager
+def _worker_sys_path():
+    """Hide Blender's bundled script directories from spawned workers.
+
+    Importing bpy prepends them to ``sys.path`` and spawned processes inherit
+    it, so a worker's ``import bpy`` would find the pure-Python ``bpy`` package
+    in ``scripts/modules`` instead of the compiled module. Workers get the
+    directories back when they import bpy themselves.
+    """
+    blender_dir = Path(bpy.utils.resource_path("LOCAL")).resolve()
+    saved = list(sys.path)
+    sys.path[:] = [
+        path for path in saved if not Path(path).resolve().is_relative_to(blender_dir)
+    ]
+    try:
+        yield
+    finally:
+        sys.path[:] = saved
+
+
+def run_tests(
+    test_configs: List[Dict[str, Any]], jobs: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """Run all test configurations, optionally across worker processes.
+
+    Configurations share no state beyond the currently open .blend file, so
+    with ``jobs > 1`` they are dispatched to a pool of processes, each with its
+    own ``bpy`` instance. Results are yielded as they complete. A failed
+    configuration is reported and the rest still run; a RuntimeError is raised
+    once all have finished.
+    """
+    total = len(test_configs)
+    failures = []
+
+    def _outcomes() -> Iterator[Tuple[Dict[str, Any], Any, Optional[Exception]]]:
+        if jobs <= 1:
+            for i, config in enumerate(test_configs, 1):
+                print(f"\n[{i}/{total}] Running {_describe(config)}")
+                try:
+                    yield config, _run_config(config), None
+                except Exception as e:
+                    yield config, None, e
+            return
+
+        # bpy is not fork-safe, so every worker starts from a fresh interpreter
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=context, initializer=disable_undo
+        ) as executor:
+            # Workers are started on submit, so this covers all of them
+            with _worker_sys_path():
+                futures = {
+                    executor.submit(_run_config, config): config
+                    for config in test_configs
+                }
+            try:
+                for future in as_completed(futures):
+                    try:
+                        yield futures[future], future.result(), None
+                    except Exception as e:
+                        yield futures[future], None, e
+            except BaseException:
+                # The caller stopped early, so don't run the queued bakes
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    with contextlib.closing(_outcomes()) as outcomes:
+        for i, (config, result, error) in enumerate(outcomes, 1):
+            if error is not None:
+                # Keep going so earlier and later results still reach the CSV
+                print(f"\n[{i}/{total}] Failed {_describe(config)}: {error!r}")
+                failures.append(error)
+                continue
+            if jobs > 1:
+                print(f"\n[{i}/{total}] Finished {_describe(config)}")
+            yield result
+
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} of {total} test configurations failed"
+        ) from failures[0]
+
+
+def get_base_metadata(
+    custom_metadata: Dict[str, str] = None, jobs: int = 1, threads_per_bake: int = 1
+) -> Dict[str, str]:
+    """Combine timestamp, platform, run and custom metadata for a run."""
     return {
-        "test_name": "raycast",
-        "test_file": test_file,
-        "cubes": cubes,
-        "points": points,
-        "elapsed_time": elapsed_time,
+        "timestamp": datetime.now().isoformat(),
+        # Platform metadata is only collected once per process
+        **get_platform_metadata(),
+        # Timings from different cache storage or with concurrent bakes competing
+        # for cores aren't directly comparable. Only rows with a DISK
+        # bake_target are written under the cache root.
+        "bake_cache_root": str(bake_cache_root()),
+        "jobs": str(jobs),
+        "threads_per_bake": str(threads_per_bake),
+        **(custom_metadata or {}),
     }
 
 
+class HeaderMismatchError(ValueError):
+    """An existing CSV file's header differs from the columns being written."""
+
+
+class CsvResultWriter:
+    """Write test results to a CSV file as they are produced.
+
+    The file is opened once, in append mode unless overwriting. Each row is
+    flushed as soon as it is written, so a crash that skips ``close`` still
+    leaves every completed result on disk. Every row is
+    prefixed with the same metadata, which must make up the leading
+    ``fieldnames``. The header is written when the file is new, empty or being
+    overwritten; appending to a file whose header differs raises
+    HeaderMismatchError.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fieldnames: List[str],
+        append: bool = True,
+        metadata: Dict[str, str] = None,
+    ):
+        self.output_path = Path(output_path)
+        self.fieldnames = list(fieldnames)
+        self.append = append
+        self.metadata = metadata or {}
+        n_metadata = len(self.metadata)
+        if set(self.fieldnames[:n_metadata]) != self.metadata.keys():
+            raise ValueError("Metadata keys must be the leading fieldnames")
+
+        # Metadata is identical for every row, so format it once
+        self._metadata_row = tuple(
+            self.metadata[key] for key in self.fieldnames[:n_metadata]
+        )
+        self._result_fields = self.fieldnames[n_metadata:]
+        self._known_result_fields = frozenset(self._result_fields)
+
+        self.mode = "a" if append and self.output_path.exists() else "w"
+        if self.mode == "a":
+            self._check_existing_header()
+        self.rows_written = 0
+        self._file = open(self.output_path, self.mode, newline="")
+        self._writer = csv.writer(self._file)
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._writer.writerow(self.fieldnames)
+            self._file.flush()
+
+    def _check_existing_header(self):
+        """Refuse to append rows under a header with different columns."""
+        with open(self.output_path, newline="") as f:
+            header = next(csv.reader(f), None)
+        if header is not None and header != self.fieldnames:
+            raise HeaderMismatchError(
+                f"Existing header in {self.output_path} does not match the "
+                f"current columns; write to a different --output. "
+                f"Missing from file: {sorted(set(self.fieldnames) - set(header))}, "
+                f"unexpected in file: {sorted(set(header) - set(self.fieldnames))}"
+            )
+
+    def __enter__(self) -> "CsvResultWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the file."""
+        self._file.close()
+
+    def write(self, result: Dict[str, Any]):
+        """Write a single result row with metadata."""
+        unknown = result.keys() - self._known_result_fields
+        if unknown:
+            raise ValueError(f"Result has fields not in fieldnames: {sorted(unknown)}")
+        self._writer.writerow(
+            self._metadata_row
+            + tuple(result.get(key, "") for key in self._result_fields)
+        )
+        # Bakes take seconds, so flushing every row costs nothing measurable
+        self._file.flush()
+        self.rows_written += 1
+
+
 def write_results_to_csv(
-    results: List[Dict[str, Any]],
+    results: Iterable[Dict[str, Any]],
     output_file: str,
     custom_metadata: Dict[str, str] = None,
     append: bool = True,
-):
-    """Write test results to CSV file with metadata."""
-    if custom_metadata is None:
-        custom_metadata = {}
-
-    output_path = Path(output_file)
-    file_exists = output_path.exists()
-
-    # Get platform metadata once
-    platform_metadata = get_platform_metadata()
-    timestamp = datetime.now().isoformat()
-
-    # Combine all metadata
-    base_metadata = {
-        "timestamp": timestamp,
-        **platform_metadata,
-        **custom_metadata,
-    }
+    jobs: int = 1,
+    threads_per_bake: int = 1,
+) -> int:
+    """Write test results to CSV file with metadata.
 
-    # Determine all possible columns from results
-    all_result_keys = set()
-    for result in results:
-        all_result_keys.update(result.keys())
+    Rows are written as ``results`` is consumed, so passing a generator keeps
+    completed results on disk if a later test fails. Returns the row count.
+    """
+    base_metadata = get_base_metadata(custom_metadata, jobs, threads_per_bake)
 
     # Create fieldnames: metadata first, then result fields
-    fieldnames = list(base_metadata.keys()) + sorted(all_result_keys)
-
-    mode = "a" if append and file_exists else "w"
+    fieldnames = list(base_metadata.keys()) + RESULT_FIELDS
 
-    with open(output_path, mode, newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    with CsvResultWriter(output_file, fieldnames, append, base_metadata) as writer:
+        for result in results:
+            writer.write(result)
 
-        # Write header if file is new or we're overwriting
-        if not file_exists or not append:
-            writer.writeheader()
+    print(f"Results written to {output_file} ({writer.mode} mode)")
+    return writer.rows_written
 
-        # Write each result row with metadata
-        for result in results:
-            row = {**base_metadata, **result}
-            writer.writerow(row)
 
-    print(f"Results written to {output_file} ({mode} mode)")
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a ``--shard`` value of the form ``I/N``."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in [0, {count})")
+    return index, count
 
 
 def main():
@@ -185,8 +428,12 @@ def main():
     parser.add_argument(
         "--output",
         "-o",
-        default="test_results.csv",
-        help="Output CSV file path (default: test_results.csv)",
+        default="results.csv",
+        help=(
+            "Output CSV file path (default: results.csv). test_results.csv holds "
+            "results from before the cpu_time, frame timing, bake and jobs "
+            "columns were added and can't be appended to"
+        ),
     )
     parser.add_argument(
         "--no-append",
@@ -201,6 +448,33 @@ def main():
         metavar=("KEY", "VALUE"),
         help="Add custom metadata (can be used multiple times)",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes, 0 for one per physical core (default: 1)",
+    )
+    parser.add_argument(
+        "--threads-per-bake",
+        type=int,
+        default=None,
+        help=(
+            "Cores assumed per bake when sizing --jobs 0; does not limit the "
+            "threads Blender uses (default: all physical cores, so --jobs 0 "
+            "runs one bake at a time)"
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        help="JSON sweep manifest from gen_manifest.py (default: built-in sweep)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="Only run shard I of N, i.e. every Nth config starting at I",
+    )
 
     args = parser.parse_args()
 
@@ -210,53 +484,64 @@ def main():
         for key, value in args.metadata:
             custom_metadata[key] = value
 
-    # # Define parameter ranges (small to large)
-    # particle_n_frames = [50, 100, 200]
-    # particle_density = [500, 1_000, 2_500, 5_000]
+    # Load the sweep, keeping only this machine's shard if requested
+    sweep = load_manifest(args.manifest) if args.manifest else build_sweep()
+    if args.shard:
+        sweep = shard(sweep, *args.shard)
 
-    # raycast_cubes = [1_000, 5_000, 10_000, 20_000]
-    # raycast_points = [1_000, 5_000, 10_000, 20_000]
-    #
-    particle_n_frames = [50, 100]
-    particle_density = [500, 1_000]
-
-    raycast_cubes = [1_000, 5_000]
-    raycast_points = [1_000, 5_000]
-
-    # Generate all test configurations using itertools
     test_configs = []
-
-    # Generate particle test configurations
-    for n_frames, density in itertools.product(particle_n_frames, particle_density):
+    for config in sweep:
+        if not isinstance(config, dict) or not {"test", "params"} <= config.keys():
+            parser.error(f"Sweep entry needs 'test' and 'params' keys: {config!r}")
+        if config["test"] not in TESTS_BY_NAME:
+            parser.error(f"Unknown test in sweep: {config['test']!r}")
+        if not isinstance(config["params"], dict):
+            parser.error(f"Sweep entry 'params' must be an object: {config!r}")
         test_configs.append(
-            {
-                "test": test_particle,
-                "params": {"n_frames": n_frames, "density": density},
-            }
+            {"test": TESTS_BY_NAME[config["test"]], "params": config["params"]}
         )
 
-    # Generate raycast test configurations
-    for cubes, points in itertools.product(raycast_cubes, raycast_points):
-        test_configs.append(
-            {"test": test_raycast, "params": {"cubes": cubes, "points": points}}
-        )
+    # Undo snapshots only cost memory in a benchmark run
+    disable_undo()
 
-    # Run all tests and collect results
-    results = []
-    for i, config in enumerate(test_configs, 1):
-        test_func = config["test"]
-        params = config["params"]
-        print(f"\n[{i}/{len(test_configs)}] Running {test_func.__name__} with {params}")
+    threads_per_bake = args.threads_per_bake or physical_cores()
+    jobs = args.jobs if args.jobs > 0 else default_jobs(threads_per_bake)
 
-        result = test_func(**params)
-        results.append(result)
+    if jobs > 1:
+        print(
+            f"Warning: running {jobs} bakes at once; they compete for cores, so "
+            "timings aren't comparable with sequential runs"
+        )
+        # Start the most expensive bakes first so no worker is left running a
+        # long bake at the end while the others sit idle (LPT scheduling)
+        test_configs.sort(key=estimated_cost, reverse=True)
+    else:
+        # Keep configs for the same .blend file together so it is only loaded
+        # once. Invariant: when run sequentially, CSV rows are grouped by
+        # test_name, then ordered lexicographically on params, so consumers can
+        # stream by group.
+        test_configs.sort(
+            key=lambda config: (
+                config["test"].__name__,
+                tuple(sorted(config["params"].items())),
+            )
+        )
 
-    # Write results to CSV
-    write_results_to_csv(
-        results, args.output, custom_metadata, append=not args.no_append
-    )
+    # Run all tests, writing each result to CSV as soon as it is available. The
+    # header is checked before the first test starts.
+    try:
+        n_results = write_results_to_csv(
+            run_tests(test_configs, jobs=jobs),
+            args.output,
+            custom_metadata,
+            append=not args.no_append,
+            jobs=jobs,
+            threads_per_bake=threads_per_bake,
+        )
+    except HeaderMismatchError as e:
+        parser.error(str(e))
 
-    print(f"\nCompleted {len(results)} tests")
+    print(f"\nCompleted {n_results} tests")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+import argparse
+import csv
+from pathlib import Path
+from typing import List, Optional
+
+
+def read_header(input_file: str) -> Optional[List[str]]:
+    """Return the header row of a CSV file, or None if it is empty."""
+    with open(input_file, newline="") as f:
+        return next(csv.reader(f), None)
+
+
+def merge_csvs(inputs: List[str], output_file: str) -> int:
+    """Concatenate result CSVs sharing the same header and return the row count.
+
+    All headers are checked before the output is opened, so a mismatch raises
+    ValueError without touching an existing output file.
+    """
+    headers = {input_file: read_header(input_file) for input_file in inputs}
+    header = next((h for h in headers.values() if h is not None), None)
+    for input_file, file_header in headers.items():
+        if file_header is not None and file_header != header:
+            raise ValueError(f"{input_file} has a different header")
+
+    n_rows = 0
+    with open(output_file, "w", newline="") as out:
+        writer = csv.writer(out)
+        if header is not None:
+            writer.writerow(header)
+        for input_file in inputs:
+            with open(input_file, newline="") as f:
+                reader = csv.reader(f)
+                if next(reader, None) is None:
+                    continue
+                for row in reader:
+                    writer.writerow(row)
+                    n_rows += 1
+
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge result CSVs from sharded runs into a single file"
+    )
+    parser.add_argument("inputs", nargs="+", help="Shard CSV files to merge")
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="results.csv",
+        help="Output CSV file path (default: results.csv)",
+    )
+
+    args = parser.parse_args()
+
+    if any(Path(p).resolve() == Path(args.output).resolve() for p in args.inputs):
+        parser.error("Output file must not be one of the inputs")
+
+    n_rows = merge_csvs(args.inputs, args.output)
+
+    print(f"Merged {n_rows} rows from {len(args.inputs)} files into {args.output}")
+
+
+if __name__ == "__main__":
+    main()